@@ -8,6 +8,12 @@ pub struct Config {
     pub database_url: String,
     pub gemini_api_key: String,
     pub prompts_dir: String,
+    pub gemini_concurrency: usize,
+    pub gemini_ocr_concurrency: usize,
+    pub gemini_grading_concurrency: usize,
+    pub gemini_model: Option<String>,
+    pub gemini_ocr_model: Option<String>,
+    pub gemini_grading_model: Option<String>,
 }
 
 impl Config {
@@ -21,6 +27,18 @@ impl Config {
                 .unwrap_or_else(|_| "postgres://localhost/ib_quiz".to_string()),
             gemini_api_key: env::var("GEMINI_API_KEY").unwrap_or_default(),
             prompts_dir: env::var("PROMPTS_DIR").unwrap_or_else(|_| "./prompts".to_string()),
+            gemini_concurrency: env::var("GEMINI_CONCURRENCY")
+                .unwrap_or_else(|_| "8".to_string())
+                .parse()?,
+            gemini_ocr_concurrency: env::var("GEMINI_OCR_CONCURRENCY")
+                .unwrap_or_else(|_| "8".to_string())
+                .parse()?,
+            gemini_grading_concurrency: env::var("GEMINI_GRADING_CONCURRENCY")
+                .unwrap_or_else(|_| "8".to_string())
+                .parse()?,
+            gemini_model: env::var("GEMINI_MODEL").ok(),
+            gemini_ocr_model: env::var("GEMINI_OCR_MODEL").ok(),
+            gemini_grading_model: env::var("GEMINI_GRADING_MODEL").ok(),
         })
     }
 }
@@ -41,7 +41,7 @@ pub async fn get_question_parts(pool: &PgPool, parent_id: Uuid) -> Result<Vec<Qu
         r#"
         SELECT * FROM questions
         WHERE parent_id = $1
-        ORDER BY part_order
+        ORDER BY part_order, id
         "#,
     )
     .bind(parent_id)
@@ -213,7 +213,7 @@ pub async fn get_quiz_history(
         LEFT JOIN quiz_answers qa ON qa.quiz_id = q.id
         GROUP BY q.id, q.subject, q.topic, q.name, q.question_ids, q.started_at, q.mode, q.paper_type
         HAVING COALESCE(array_length(q.question_ids, 1), 0) > 0
-        ORDER BY q.started_at DESC
+        ORDER BY q.started_at DESC, q.id
         LIMIT $1
         "#,
     )
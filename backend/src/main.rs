@@ -12,20 +12,21 @@ use axum::{
     routing::{get, post},
     Router,
 };
+use tower_http::compression::CompressionLayer;
 use tower_http::cors::{Any, CorsLayer};
 use tower_http::trace::TraceLayer;
 use tracing_subscriber::{layer::SubscriberExt, util::SubscriberInitExt};
 
 use crate::config::Config;
 use crate::db::Database;
-use crate::services::PromptLoader;
+use crate::services::{ConcurrencyLimits, GeminiClient, PromptLoader};
 
 #[derive(Clone)]
 pub struct AppState {
     pub db: Database,
-    pub config: Config,
-    pub http_client: reqwest::Client,
-    pub prompt_loader: Arc<PromptLoader>,
+    // Shared rather than cloned: axum clones AppState for every request
+    pub config: Arc<Config>,
+    pub gemini: Arc<GeminiClient>,
 }
 
 #[tokio::main]
@@ -53,12 +54,23 @@ async fn main() -> anyhow::Result<()> {
     let prompt_loader = Arc::new(PromptLoader::new(PathBuf::from(&config.prompts_dir)));
     tracing::info!("Prompts directory: {}", config.prompts_dir);
 
+    // Shared Gemini client, reused by every handler
+    let limits = ConcurrencyLimits {
+        generation: config.gemini_concurrency,
+        ocr: config.gemini_ocr_concurrency,
+        grading: config.gemini_grading_concurrency,
+    };
+    let gemini = Arc::new(GeminiClient::new(prompt_loader, limits).with_models(
+        config.gemini_model.as_deref(),
+        config.gemini_ocr_model.as_deref(),
+        config.gemini_grading_model.as_deref(),
+    ));
+
     // Create app state
     let state = AppState {
         db,
-        config: config.clone(),
-        http_client: reqwest::Client::new(),
-        prompt_loader,
+        config: Arc::new(config.clone()),
+        gemini,
     };
 
     // CORS layer
@@ -79,6 +91,7 @@ async fn main() -> anyhow::Result<()> {
         .route("/api/quiz/next", get(routes::quiz::get_next_question))
         .route("/api/quiz/submit", post(routes::quiz::submit_answer))
         .route("/api/quiz/history", get(routes::quiz::get_history))
+        .route("/api/grading/cache/stats", get(routes::quiz::get_grading_cache_stats))
         // Progress routes
         .route("/api/progress", get(routes::progress::get_progress))
         .route("/api/progress/topics", get(routes::progress::get_topic_progress))
@@ -86,6 +99,8 @@ async fn main() -> anyhow::Result<()> {
         .route("/api/ocr", post(routes::ocr::ocr_image))
         // Middleware
         .layer(TraceLayer::new_for_http())
+        // Gzip JSON responses (quiz payloads carry every question and solution step)
+        .layer(CompressionLayer::new())
         .layer(cors)
         .with_state(state);
 
@@ -57,10 +57,14 @@ impl Question {
     }
 }
 
+// Aliases accept the "step"/"expression" keys used in generated JSON, so
+// Gemini responses deserialize straight into this type
 #[derive(Debug, Clone, Serialize, Deserialize)]
 pub struct SolutionStep {
+    #[serde(alias = "step")]
     pub step_number: i32,
     pub description: String,
+    #[serde(alias = "expression")]
     pub expression_latex: String,
 }
 
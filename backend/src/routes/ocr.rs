@@ -1,13 +1,32 @@
-use axum::{extract::State, Json};
+use axum::{body::Bytes, extract::State, Json};
 use serde::{Deserialize, Serialize};
+use std::borrow::Cow;
 
-use crate::error::AppResult;
-use crate::services::GeminiClient;
+use crate::error::{AppError, AppResult};
 use crate::AppState;
 
+// Borrows the (potentially multi-MB) image straight from the request body
 #[derive(Debug, Deserialize)]
-pub struct OcrRequest {
-    pub image_base64: String,
+pub struct OcrRequest<'a> {
+    #[serde(borrow)]
+    pub image_base64: Cow<'a, str>,
+}
+
+impl<'a> OcrRequest<'a> {
+    /// Accept either `{"image_base64": "..."}` or the raw base64 text as the body
+    fn from_body(body: &'a [u8]) -> AppResult<Self> {
+        let first = body.iter().find(|b| !b.is_ascii_whitespace());
+        if first == Some(&b'{') {
+            return Ok(serde_json::from_slice(body)?);
+        }
+
+        let image_base64 = std::str::from_utf8(body)
+            .map_err(|_| AppError::BadRequest("Image must be base64 text".to_string()))?
+            .trim();
+        Ok(Self {
+            image_base64: Cow::Borrowed(image_base64),
+        })
+    }
 }
 
 #[derive(Debug, Serialize)]
@@ -18,10 +37,9 @@ pub struct OcrResponse {
     pub error: Option<String>,
 }
 
-pub async fn ocr_image(
-    State(state): State<AppState>,
-    Json(request): Json<OcrRequest>,
-) -> AppResult<Json<OcrResponse>> {
+pub async fn ocr_image(State(state): State<AppState>, body: Bytes) -> AppResult<Json<OcrResponse>> {
+    let request = OcrRequest::from_body(&body)?;
+
     // Check if Gemini API key is configured
     if state.config.gemini_api_key.is_empty() {
         return Ok(Json(OcrResponse {
@@ -32,11 +50,7 @@ pub async fn ocr_image(
         }));
     }
 
-    let client = GeminiClient::new(
-        state.http_client.clone(),
-        &state.config.gemini_api_key,
-        state.prompt_loader.clone(),
-    );
+    let client = &state.gemini;
 
     match client.ocr_image(&request.image_base64).await {
         Ok(latex) => Ok(Json(OcrResponse {
@@ -56,3 +70,45 @@ pub async fn ocr_image(
         }
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_from_body_json() {
+        let request = OcrRequest::from_body(br#"{"image_base64": "iVBORw0KGgo="}"#).unwrap();
+        assert!(matches!(
+            request.image_base64,
+            Cow::Borrowed("iVBORw0KGgo=")
+        ));
+
+        // Escapes such as \/ cannot be borrowed and are decoded into an owned string
+        let request = OcrRequest::from_body(br#" {"image_base64": "/9j\/4AAQ"}"#).unwrap();
+        assert!(matches!(request.image_base64, Cow::Owned(ref s) if s == "/9j/4AAQ"));
+    }
+
+    #[test]
+    fn test_from_body_raw_base64() {
+        let request = OcrRequest::from_body(b"\n  iVBORw0KGgo=\r\n").unwrap();
+        assert!(matches!(
+            request.image_base64,
+            Cow::Borrowed("iVBORw0KGgo=")
+        ));
+
+        let request = OcrRequest::from_body(b"data:image/jpeg;base64,/9j/4AAQ").unwrap();
+        assert_eq!(request.image_base64, "data:image/jpeg;base64,/9j/4AAQ");
+    }
+
+    #[test]
+    fn test_from_body_rejects_invalid_input() {
+        assert!(matches!(
+            OcrRequest::from_body(b"\xff\xfe"),
+            Err(AppError::BadRequest(_))
+        ));
+        assert!(matches!(
+            OcrRequest::from_body(br#"{"image_base64": "#),
+            Err(AppError::Json(_))
+        ));
+    }
+}
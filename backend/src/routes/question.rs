@@ -1,47 +1,48 @@
 use axum::{extract::State, Json};
+use std::future::Future;
 
 use crate::db::insert_question;
 use crate::error::AppResult;
 use crate::models::{GenerateQuestionRequest, GenerateQuestionResponse, Question};
-use crate::services::GeminiClient;
 use crate::AppState;
 
 pub async fn generate_question(
     State(state): State<AppState>,
     Json(request): Json<GenerateQuestionRequest>,
 ) -> AppResult<Json<GenerateQuestionResponse>> {
-    let count = request.count.unwrap_or(1).min(5); // Max 5 questions at a time
+    let count = request.count.unwrap_or(1).clamp(0, 5); // Max 5 questions at a time
     let difficulty = request.difficulty.unwrap_or(3).clamp(1, 5);
 
     let mut questions: Vec<Question> = Vec::with_capacity(count as usize);
 
     // Check if Gemini API key is configured
     if !state.config.gemini_api_key.is_empty() {
-        let client = GeminiClient::new(
-            state.http_client.clone(),
-            &state.config.gemini_api_key,
-            state.prompt_loader.clone(),
-        );
+        let client = &state.gemini;
 
-        for _ in 0..count {
-            match client
-                .generate_question(&request.subject, &request.topic, difficulty, None)
-                .await
-            {
-                Ok(question) => {
-                    // Store in database
-                    if let Ok(stored) = insert_question(&state.db.pool, &question).await {
-                        questions.push(stored);
-                    } else {
-                        questions.push(question);
-                    }
-                }
-                Err(e) => {
-                    tracing::warn!("Failed to generate question: {}", e);
-                    // Fall back to template question
-                    let fallback = create_fallback_question(&request.subject, &request.topic, difficulty);
-                    questions.push(fallback);
-                }
+        let generated = generate_with_top_up(
+            count as usize,
+            |n| {
+                client.generate_questions(
+                    &request.subject,
+                    &request.topic,
+                    difficulty,
+                    None,
+                    n as i32,
+                )
+            },
+            || client.generate_question(&request.subject, &request.topic, difficulty, None),
+        )
+        .await;
+
+        for question in generated {
+            match question {
+                Some(question) => questions.push(store_question(&state.db.pool, question).await),
+                // Fall back to template question
+                None => questions.push(create_fallback_question(
+                    &request.subject,
+                    &request.topic,
+                    difficulty,
+                )),
             }
         }
     } else {
@@ -56,6 +57,56 @@ pub async fn generate_question(
     Ok(Json(GenerateQuestionResponse { questions }))
 }
 
+/// Generate `count` questions with one batched call when several are wanted,
+/// then single calls for whatever the batch did not return. Failed single
+/// calls yield None so the caller can substitute a template question.
+async fn generate_with_top_up<B, BFut, S, SFut>(
+    count: usize,
+    batch: B,
+    mut single: S,
+) -> Vec<Option<Question>>
+where
+    B: FnOnce(usize) -> BFut,
+    BFut: Future<Output = AppResult<Vec<Question>>>,
+    S: FnMut() -> SFut,
+    SFut: Future<Output = AppResult<Question>>,
+{
+    let mut questions = Vec::with_capacity(count);
+
+    if count > 1 {
+        match batch(count).await {
+            Ok(generated) => questions.extend(generated.into_iter().take(count).map(Some)),
+            Err(e) => {
+                tracing::warn!(
+                    "Batched question generation failed, generating individually: {}",
+                    e
+                );
+            }
+        }
+    }
+
+    // Generate any remaining questions individually
+    while questions.len() < count {
+        match single().await {
+            Ok(question) => questions.push(Some(question)),
+            Err(e) => {
+                tracing::warn!("Failed to generate question: {}", e);
+                questions.push(None);
+            }
+        }
+    }
+
+    questions
+}
+
+/// Store a generated question, keeping the unsaved copy if the insert fails
+async fn store_question(pool: &sqlx::PgPool, question: Question) -> Question {
+    match insert_question(pool, &question).await {
+        Ok(stored) => stored,
+        Err(_) => question,
+    }
+}
+
 fn create_fallback_question(subject: &str, topic: &str, difficulty: i32) -> Question {
     use crate::models::SolutionStep;
 
@@ -168,3 +219,84 @@ fn create_fallback_question(subject: &str, topic: &str, difficulty: i32) -> Ques
 
     Question::new(subject, topic, difficulty, &question, &answer, steps, "template")
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::error::AppError;
+    use std::cell::Cell;
+
+    fn sample(source: &str) -> Question {
+        Question::new("math", "Algebra", 3, "x + 1 = 2", "x = 1", vec![], source)
+    }
+
+    fn sources(questions: &[Option<Question>]) -> Vec<Option<&str>> {
+        questions
+            .iter()
+            .map(|q| q.as_ref().map(|q| q.source.as_str()))
+            .collect()
+    }
+
+    #[tokio::test]
+    async fn test_short_batch_is_topped_up() {
+        let singles = Cell::new(0);
+        let questions = generate_with_top_up(
+            3,
+            |n| async move {
+                assert_eq!(n, 3);
+                Ok(vec![sample("batch")])
+            },
+            || {
+                singles.set(singles.get() + 1);
+                async { Ok(sample("single")) }
+            },
+        )
+        .await;
+
+        assert_eq!(singles.get(), 2);
+        assert_eq!(
+            sources(&questions),
+            vec![Some("batch"), Some("single"), Some("single")]
+        );
+    }
+
+    #[tokio::test]
+    async fn test_failed_batch_falls_back_to_single_calls() {
+        let singles = Cell::new(0);
+        let questions = generate_with_top_up(
+            2,
+            |_| async { Err(AppError::ExternalService("batch failed".to_string())) },
+            || {
+                singles.set(singles.get() + 1);
+                let first = singles.get() == 1;
+                async move {
+                    if first {
+                        Ok(sample("single"))
+                    } else {
+                        Err(AppError::ExternalService("single failed".to_string()))
+                    }
+                }
+            },
+        )
+        .await;
+
+        assert_eq!(sources(&questions), vec![Some("single"), None]);
+    }
+
+    #[tokio::test]
+    async fn test_single_question_skips_batch() {
+        let batched = Cell::new(false);
+        let questions = generate_with_top_up(
+            1,
+            |_| {
+                batched.set(true);
+                async { Ok(vec![]) }
+            },
+            || async { Ok(sample("single")) },
+        )
+        .await;
+
+        assert!(!batched.get());
+        assert_eq!(sources(&questions), vec![Some("single")]);
+    }
+}
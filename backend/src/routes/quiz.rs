@@ -15,7 +15,8 @@ use crate::models::{
     Question, QuizAnswer, QuizNextRequest, QuizNextResponse,
     QuizSubmitRequest, QuizSubmitResponse,
 };
-use crate::services::GeminiClient;
+use crate::services::answer_check::{answers_match_locally, replace_all};
+use crate::services::grade_cache::CacheStats;
 use crate::AppState;
 
 // Fixed exam-level difficulty for all questions
@@ -93,11 +94,7 @@ pub async fn create_new_quiz(
 
     // Generate ALL questions in a single API call
     let generated_questions = if !state.config.gemini_api_key.is_empty() {
-        let client = GeminiClient::new(
-            state.http_client.clone(),
-            &state.config.gemini_api_key,
-            state.prompt_loader.clone(),
-        );
+        let client = &state.gemini;
         client
             .generate_questions(
                 &request.subject,
@@ -251,13 +248,12 @@ pub async fn submit_answer(
         .await?
         .ok_or_else(|| AppError::NotFound("Quiz not found".to_string()))?;
 
-    // Grade the answer using Gemini
-    let is_correct = if !state.config.gemini_api_key.is_empty() {
-        let client = GeminiClient::new(
-            state.http_client.clone(),
-            &state.config.gemini_api_key,
-            state.prompt_loader.clone(),
-        );
+    // Answers that are trivially equal are accepted locally; everything else
+    // is graded by Gemini
+    let is_correct = if answers_match_locally(&request.answer_latex, &question.answer_latex) {
+        true
+    } else if !state.config.gemini_api_key.is_empty() {
+        let client = &state.gemini;
         client
             .grade_answer(
                 &question.question_latex,
@@ -275,7 +271,7 @@ pub async fn submit_answer(
         id: Uuid::new_v4(),
         quiz_id: request.quiz_id,
         question_id: request.question_id,
-        answer_latex: request.answer_latex.clone(),
+        answer_latex: request.answer_latex,
         is_correct,
         time_taken: request.time_taken,
         answered_at: None,
@@ -309,14 +305,19 @@ pub async fn get_history(State(state): State<AppState>) -> AppResult<Json<Vec<Qu
     Ok(Json(history))
 }
 
+/// GET /api/grading/cache/stats - Hit rate of the grading result cache
+pub async fn get_grading_cache_stats(State(state): State<AppState>) -> Json<CacheStats> {
+    Json(state.gemini.grade_cache_stats())
+}
+
 /// Simple answer checking fallback
 fn simple_check_answer(user_answer: &str, correct_answer: &str) -> bool {
     let normalize = |s: &str| {
-        s.replace(" ", "")
-            .replace(r"\left", "")
-            .replace(r"\right", "")
-            .replace(r"\cdot", "*")
-            .to_lowercase()
+        replace_all(
+            s,
+            &[(" ", ""), (r"\left", ""), (r"\right", ""), (r"\cdot", "*")],
+        )
+        .to_lowercase()
     };
 
     let user_normalized = normalize(user_answer);
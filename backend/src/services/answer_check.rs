@@ -0,0 +1,482 @@
+/// Relative tolerance used when comparing evaluated answers
+const TOLERANCE: f64 = 1e-9;
+
+/// Cheap checks that prove two answers equal without an LLM round-trip:
+/// identical LaTeX once spacing and \left/\right are ignored, equal numeric
+/// values, or the same set of roots.
+pub fn answers_match_locally(user_answer: &str, correct_answer: &str) -> bool {
+    strip_formatting(user_answer) == strip_formatting(correct_answer)
+        || numeric_answers_match(user_answer, correct_answer)
+        || root_sets_match(user_answer, correct_answer)
+}
+
+/// Drop whitespace and \left / \right sizing commands. Like
+/// `Parser::eat_command`, a command only matches when no letter follows, so
+/// \leftarrow and \rightarrow are kept.
+fn strip_formatting(latex: &str) -> String {
+    let mut result = String::with_capacity(latex.len());
+    let mut rest = latex;
+
+    while let Some(c) = rest.chars().next() {
+        if let Some(tail) = rest
+            .strip_prefix(r"\left")
+            .or_else(|| rest.strip_prefix(r"\right"))
+            .filter(|tail| !tail.starts_with(|c: char| c.is_ascii_alphabetic()))
+        {
+            rest = tail;
+            continue;
+        }
+        if !matches!(c, ' ' | '\t' | '\n' | '\r') {
+            result.push(c);
+        }
+        rest = &rest[c.len_utf8()..];
+    }
+
+    result
+}
+
+/// Apply literal substitutions in a single left-to-right pass instead of one
+/// full scan (and intermediate String) per `str::replace`. The first matching
+/// rule wins at each position; patterns must be non-empty.
+pub fn replace_all(text: &str, rules: &[(&str, &str)]) -> String {
+    let mut result = String::with_capacity(text.len());
+    let mut rest = text;
+
+    'scan: while let Some(c) = rest.chars().next() {
+        for (from, to) in rules {
+            if let Some(tail) = rest.strip_prefix(from) {
+                result.push_str(to);
+                rest = tail;
+                continue 'scan;
+            }
+        }
+        result.push(c);
+        rest = &rest[c.len_utf8()..];
+    }
+
+    result
+}
+
+/// Check whether two LaTeX answers evaluate to the same number.
+/// Returns false when either side is not a plain numeric expression, so
+/// callers can fall back to a slower (symbolic or LLM) comparison.
+pub fn numeric_answers_match(user_answer: &str, correct_answer: &str) -> bool {
+    match (evaluate_numeric(user_answer), evaluate_numeric(correct_answer)) {
+        (Some(user), Some(correct)) => approx_eq(user, correct),
+        _ => false,
+    }
+}
+
+/// Compare answers that list roots, e.g. `x = 3 \text{ or } x = -\frac{1}{2}`
+/// against `x = -0.5, x = 3`, as unordered sets of numeric values.
+/// Values bound to different names (`x = 2, y = 3`, `u_1 = 7, u_2 = 3`) are
+/// compared name by name, and unnamed lists such as `3, 2` keep their order.
+pub fn root_sets_match(user_answer: &str, correct_answer: &str) -> bool {
+    let (Some(user), Some(correct)) = (
+        parse_root_list(user_answer),
+        parse_root_list(correct_answer),
+    ) else {
+        return false;
+    };
+
+    match (user, correct) {
+        (RootList::Bindings(user), RootList::Bindings(correct)) => {
+            user.len() == correct.len()
+                && user.iter().all(|(name, value)| {
+                    correct
+                        .iter()
+                        .any(|(other, expected)| other == name && approx_eq(*value, *expected))
+                })
+        }
+        (RootList::Bindings(_), _) | (_, RootList::Bindings(_)) => false,
+        (RootList::Sequence(user), RootList::Sequence(correct)) => values_match(&user, &correct),
+        (RootList::Set(Some(user_var), _), RootList::Set(Some(correct_var), _))
+            if user_var != correct_var =>
+        {
+            false
+        }
+        (
+            RootList::Set(_, mut user) | RootList::Sequence(mut user),
+            RootList::Set(_, mut correct) | RootList::Sequence(mut correct),
+        ) => {
+            user.sort_by(f64::total_cmp);
+            correct.sort_by(f64::total_cmp);
+            values_match(&user, &correct)
+        }
+    }
+}
+
+fn values_match(user: &[f64], correct: &[f64]) -> bool {
+    user.len() == correct.len() && user.iter().zip(correct).all(|(&a, &b)| approx_eq(a, b))
+}
+
+enum RootList {
+    /// Roots of a single variable (`x = 2, x = 3`) or an explicit set `\{2, 3\}`
+    Set(Option<String>, Vec<f64>),
+    /// Unnamed values whose order matters, e.g. `3, 2`
+    Sequence(Vec<f64>),
+    /// Values bound to distinct names, e.g. `x = 2, y = 3` or `a_1 = 5, a_{10} = 2`
+    Bindings(Vec<(String, f64)>),
+}
+
+/// Split a root list on commas / "or" / "and" and evaluate each part,
+/// dropping a leading `x =` style variable. Lists that only name some parts,
+/// or repeat some names but not others, yield None.
+fn parse_root_list(latex: &str) -> Option<RootList> {
+    let list = replace_all(
+        latex,
+        &[
+            (r"\,", " "),
+            (r"\text{ or }", ","),
+            (r"\text{or}", ","),
+            (r"\text{ and }", ","),
+            (r"\quad", ","),
+        ],
+    );
+    let list = list.trim();
+    let (list, is_set) = match list.strip_prefix(r"\{").and_then(|l| l.strip_suffix(r"\}")) {
+        Some(inner) => (inner, true),
+        None => (list, false),
+    };
+
+    let mut names = Vec::new();
+    let mut values = Vec::new();
+    for part in list
+        .split(',')
+        .map(str::trim)
+        .filter(|part| !part.is_empty())
+    {
+        let (name, value) = split_variable(part);
+        names.push(name);
+        values.push(evaluate_numeric(value)?);
+    }
+    if values.is_empty() {
+        return None;
+    }
+
+    if names.iter().all(Option::is_none) {
+        return Some(if is_set {
+            RootList::Set(None, values)
+        } else {
+            RootList::Sequence(values)
+        });
+    }
+
+    let mut names: Vec<String> = names.into_iter().collect::<Option<_>>()?;
+    if names.iter().all(|name| *name == names[0]) {
+        Some(RootList::Set(Some(names.swap_remove(0)), values))
+    } else if (0..names.len()).all(|i| !names[..i].contains(&names[i])) {
+        Some(RootList::Bindings(names.into_iter().zip(values).collect()))
+    } else {
+        None
+    }
+}
+
+/// `x = 3` -> (Some("x"), `3`), `a_{10} = -2` -> (Some("a_10"), `-2`);
+/// anything else (including `2x = 4`) is returned unchanged with no variable
+fn split_variable(part: &str) -> (Option<String>, &str) {
+    match part.split_once('=') {
+        Some((lhs, rhs)) if is_variable_name(lhs.trim()) => {
+            let name = lhs
+                .trim()
+                .chars()
+                .filter(|c| !matches!(c, '{' | '}'))
+                .collect();
+            (Some(name), rhs)
+        }
+        _ => (None, part),
+    }
+}
+
+/// A letter followed by letters, digits or a subscript, e.g. `x`, `x_1`, `a_{10}`
+fn is_variable_name(name: &str) -> bool {
+    let mut chars = name.chars();
+    chars.next().is_some_and(|c| c.is_ascii_alphabetic())
+        && chars.all(|c| c.is_ascii_alphanumeric() || matches!(c, '_' | '{' | '}'))
+}
+
+/// Purely relative, so small magnitudes such as 2 \times 10^{-10} are still
+/// told apart; zero only equals zero
+fn approx_eq(a: f64, b: f64) -> bool {
+    a == b || (a - b).abs() <= TOLERANCE * a.abs().max(b.abs())
+}
+
+/// Evaluate a numeric LaTeX expression such as `-\frac{3}{4}` or `2\sqrt{3}`.
+/// Supports + - * / (incl. \cdot, \times, \div), ^, parentheses and braces,
+/// \frac, \sqrt and \pi. Anything else (variables, units, text) yields None.
+pub fn evaluate_numeric(latex: &str) -> Option<f64> {
+    let mut parser = Parser {
+        src: latex.as_bytes(),
+        pos: 0,
+    };
+    let value = parser.expr()?;
+    parser.skip_ws();
+    if parser.pos == parser.src.len() && value.is_finite() {
+        Some(value)
+    } else {
+        None
+    }
+}
+
+/// Recursive-descent parser over the raw LaTeX bytes
+struct Parser<'a> {
+    src: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> Parser<'a> {
+    fn peek(&self) -> Option<u8> {
+        self.src.get(self.pos).copied()
+    }
+
+    /// Name of the LaTeX command at the cursor, e.g. "frac" for `\frac`
+    fn peek_command(&self) -> Option<&'a str> {
+        if self.peek() != Some(b'\\') {
+            return None;
+        }
+        let start = self.pos + 1;
+        let len = self.src[start..]
+            .iter()
+            .take_while(|b| b.is_ascii_alphabetic())
+            .count();
+        std::str::from_utf8(&self.src[start..start + len]).ok()
+    }
+
+    fn eat_command(&mut self, name: &str) -> bool {
+        if self.peek_command() == Some(name) {
+            self.pos += 1 + name.len();
+            true
+        } else {
+            false
+        }
+    }
+
+    /// Skip whitespace, spacing commands (\, \; \! \ ) and \left / \right
+    fn skip_ws(&mut self) {
+        loop {
+            match self.peek() {
+                Some(b' ' | b'\t' | b'\n' | b'\r') => self.pos += 1,
+                Some(b'\\') => match self.src.get(self.pos + 1) {
+                    Some(b',' | b';' | b'!' | b' ') => self.pos += 2,
+                    _ => {
+                        if !(self.eat_command("left") || self.eat_command("right")) {
+                            return;
+                        }
+                    }
+                },
+                _ => return,
+            }
+        }
+    }
+
+    fn expr(&mut self) -> Option<f64> {
+        let mut value = self.term()?;
+        loop {
+            self.skip_ws();
+            match self.peek() {
+                Some(b'+') => {
+                    self.pos += 1;
+                    value += self.term()?;
+                }
+                Some(b'-') => {
+                    self.pos += 1;
+                    value -= self.term()?;
+                }
+                _ => return Some(value),
+            }
+        }
+    }
+
+    fn term(&mut self) -> Option<f64> {
+        let mut value = self.unary()?;
+        loop {
+            self.skip_ws();
+            if self.peek() == Some(b'*') {
+                self.pos += 1;
+                value *= self.unary()?;
+            } else if self.peek() == Some(b'/') {
+                self.pos += 1;
+                value /= self.unary()?;
+            } else if self.eat_command("cdot") || self.eat_command("times") {
+                value *= self.unary()?;
+            } else if self.eat_command("div") {
+                value /= self.unary()?;
+            } else if self.starts_implicit_factor() {
+                // Juxtaposition such as 2\sqrt{3} or 3(1+2)
+                value *= self.power()?;
+            } else {
+                return Some(value);
+            }
+        }
+    }
+
+    fn starts_implicit_factor(&self) -> bool {
+        match self.peek() {
+            Some(b'(' | b'{') => true,
+            Some(b'\\') => matches!(
+                self.peek_command(),
+                Some("frac" | "dfrac" | "tfrac" | "sqrt" | "pi")
+            ),
+            _ => false,
+        }
+    }
+
+    fn unary(&mut self) -> Option<f64> {
+        self.skip_ws();
+        match self.peek() {
+            Some(b'-') => {
+                self.pos += 1;
+                Some(-self.unary()?)
+            }
+            Some(b'+') => {
+                self.pos += 1;
+                self.unary()
+            }
+            _ => self.power(),
+        }
+    }
+
+    fn power(&mut self) -> Option<f64> {
+        let base = self.primary()?;
+        self.skip_ws();
+        if self.peek() != Some(b'^') {
+            return Some(base);
+        }
+        self.pos += 1;
+        let exponent = self.argument()?;
+        Some(base.powf(exponent))
+    }
+
+    /// A single LaTeX argument: a braced group or one token (as in \frac12 or x^2)
+    fn argument(&mut self) -> Option<f64> {
+        self.skip_ws();
+        match self.peek() {
+            Some(b'{') => self.primary(),
+            Some(c) if c.is_ascii_digit() => {
+                self.pos += 1;
+                Some(f64::from(c - b'0'))
+            }
+            _ => self.primary(),
+        }
+    }
+
+    fn primary(&mut self) -> Option<f64> {
+        self.skip_ws();
+        match self.peek()? {
+            b'(' => self.group(b')'),
+            b'{' => self.group(b'}'),
+            b'[' => self.group(b']'),
+            c if c.is_ascii_digit() || c == b'.' => self.number(),
+            b'\\' => {
+                if self.eat_command("frac") || self.eat_command("dfrac") || self.eat_command("tfrac")
+                {
+                    let numerator = self.argument()?;
+                    let denominator = self.argument()?;
+                    Some(numerator / denominator)
+                } else if self.eat_command("sqrt") {
+                    self.skip_ws();
+                    let degree = if self.peek() == Some(b'[') {
+                        self.group(b']')?
+                    } else {
+                        2.0
+                    };
+                    let radicand = self.argument()?;
+                    Some(radicand.powf(1.0 / degree))
+                } else if self.eat_command("pi") {
+                    Some(std::f64::consts::PI)
+                } else {
+                    None
+                }
+            }
+            _ => None,
+        }
+    }
+
+    fn group(&mut self, close: u8) -> Option<f64> {
+        self.pos += 1;
+        let value = self.expr()?;
+        self.skip_ws();
+        if self.peek() != Some(close) {
+            return None;
+        }
+        self.pos += 1;
+        Some(value)
+    }
+
+    fn number(&mut self) -> Option<f64> {
+        let start = self.pos;
+        while matches!(self.peek(), Some(c) if c.is_ascii_digit() || c == b'.') {
+            self.pos += 1;
+        }
+        std::str::from_utf8(&self.src[start..self.pos])
+            .ok()?
+            .parse()
+            .ok()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_evaluate_numeric() {
+        assert_eq!(evaluate_numeric("42"), Some(42.0));
+        assert_eq!(evaluate_numeric(r"-\frac{1}{2}"), Some(-0.5));
+        assert_eq!(evaluate_numeric(r"\frac12"), Some(0.5));
+        assert_eq!(evaluate_numeric(r"2^{10} - 3 \cdot 4"), Some(1012.0));
+        assert_eq!(evaluate_numeric(r"\left(1 + 2\right)^2"), Some(9.0));
+        assert_eq!(evaluate_numeric("x + 1"), None);
+        assert_eq!(evaluate_numeric(r"2 \text{ mol}"), None);
+        assert_eq!(evaluate_numeric(r"\frac{1}{0}"), None);
+    }
+
+    #[test]
+    fn test_numeric_answers_match() {
+        assert!(numeric_answers_match("0.5", r"\frac{1}{2}"));
+        assert!(numeric_answers_match(r"2\sqrt{3}", r"\sqrt{12}"));
+        assert!(numeric_answers_match(r"\frac{\pi}{2}", r"\dfrac{\pi}{2}"));
+        assert!(!numeric_answers_match("0.33", r"\frac{1}{3}"));
+        assert!(!numeric_answers_match("3", "x = 3"));
+        assert!(numeric_answers_match(r"2 \times 10^{-10}", "0.0000000002"));
+        assert!(!numeric_answers_match(r"2 \times 10^{-10}", r"3 \times 10^{-10}"));
+        assert!(!numeric_answers_match(r"10^{-12}", "0"));
+    }
+
+    #[test]
+    fn test_root_sets_match() {
+        assert!(root_sets_match(
+            r"x = 3 \text{ or } x = -\frac{1}{2}",
+            "x = -0.5, x = 3"
+        ));
+        assert!(root_sets_match(r"\{3, -1\}", "x = -1, x = 3"));
+        assert!(root_sets_match(r"x_1 = 2, x_2 = -2", "x_2 = -2, x_1 = 2"));
+        assert!(root_sets_match("x = 2, y = 3", "y = 3, x = 2"));
+        assert!(root_sets_match("3", "x = 3"));
+        assert!(!root_sets_match("x = 3", r"x = 3 \text{ or } x = -1"));
+        assert!(!root_sets_match("x = y + 1", "x = 1"));
+        // Systems of equations and sequence terms keep their names
+        assert!(!root_sets_match("x = 2, y = 3", "x = 3, y = 2"));
+        assert!(!root_sets_match("a = 1, b = 2", "b = 1, a = 2"));
+        assert!(!root_sets_match("u_1 = 7, u_2 = 3", "u_1 = 3, u_2 = 7"));
+        assert!(!root_sets_match(
+            "a_1 = 5, a_{10} = 2",
+            "a_1 = 2, a_{10} = 5"
+        ));
+        assert!(!root_sets_match("x = 2", "y = 2"));
+        assert!(!root_sets_match("x = 2, 3", "x = 2, x = 3"));
+        assert!(!root_sets_match("2x = 4", "4"));
+        // Unnamed lists are ordered
+        assert!(!root_sets_match("3, 2", "2, 3"));
+    }
+
+    #[test]
+    fn test_answers_match_locally() {
+        assert!(answers_match_locally(r"3x^2 + 4x - 5", r"3x^2+4x-5"));
+        assert!(answers_match_locally(r"\left(x+1\right)^2", "(x + 1)^2"));
+        assert!(answers_match_locally("0.25", r"\frac{1}{4}"));
+        assert!(!answers_match_locally("X", "x"));
+        assert!(!answers_match_locally(r"A \rightarrow B", r"A \leftarrow B"));
+        assert!(!answers_match_locally(r"A \leftrightarrow B", r"A \leftarrow B"));
+    }
+}
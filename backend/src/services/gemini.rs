@@ -1,46 +1,60 @@
-use genai::chat::{ChatMessage, ChatOptions, ChatRequest, ContentPart};
+use genai::chat::{ChatMessage, ChatOptions, ChatRequest, ChatResponse, ContentPart};
 use genai::Client;
 use serde::Deserialize;
 use std::collections::HashMap;
 use std::sync::Arc;
+use tokio::sync::Semaphore;
 
 use crate::error::{AppError, AppResult};
 use crate::models::{Question, SolutionStep};
+use crate::services::grade_cache::{CacheStats, GradeCache, DEFAULT_CAPACITY};
 use crate::services::PromptLoader;
 
 const GRADING_MODEL: &str = "gemini-3-flash-preview";
 
 const MODEL: &str = "gemini-3-flash-preview";
 
+/// LaTeX commands whose backslash must be doubled to survive JSON parsing
+const LATEX_COMMANDS: &[&str] = &[
+    "frac", "sqrt", "sum", "prod", "int", "lim", "infty", "partial",
+    "alpha", "beta", "gamma", "delta", "epsilon", "theta", "lambda", "mu",
+    "pi", "sigma", "omega", "phi", "psi", "rho", "tau", "nu", "xi", "zeta",
+    "cdot", "times", "div", "pm", "mp", "leq", "geq", "neq", "approx",
+    "in", "notin", "subset", "supset", "cup", "cap", "forall", "exists",
+    "rightarrow", "leftarrow", "Rightarrow", "Leftarrow", "implies",
+    "sin", "cos", "tan", "cot", "sec", "csc", "ln", "log", "exp",
+    "mathbb", "mathbf", "mathrm", "text", "left", "right", "Big", "big",
+    "begin", "end", "quad", "qquad", "hspace", "vspace", "newline",
+    ",", ";", "!", ":", " ",  // LaTeX spacing commands
+];
+
 /// Fix LaTeX escapes in JSON - LLMs often output \frac instead of \\frac
+/// Single pass: a lone backslash before a known command is doubled, while
+/// already escaped sequences (\\frac) are left untouched.
 fn fix_latex_escapes(json: &str) -> String {
-    let mut result = json.to_string();
-    let latex_commands = [
-        "frac", "sqrt", "sum", "prod", "int", "lim", "infty", "partial",
-        "alpha", "beta", "gamma", "delta", "epsilon", "theta", "lambda", "mu",
-        "pi", "sigma", "omega", "phi", "psi", "rho", "tau", "nu", "xi", "zeta",
-        "cdot", "times", "div", "pm", "mp", "leq", "geq", "neq", "approx",
-        "in", "notin", "subset", "supset", "cup", "cap", "forall", "exists",
-        "rightarrow", "leftarrow", "Rightarrow", "Leftarrow", "implies",
-        "sin", "cos", "tan", "cot", "sec", "csc", "ln", "log", "exp",
-        "mathbb", "mathbf", "mathrm", "text", "left", "right", "Big", "big",
-        "begin", "end", "quad", "qquad", "hspace", "vspace", "newline",
-        ",", ";", "!", ":", " ",  // LaTeX spacing commands
-    ];
-
-    for cmd in latex_commands {
-        let single = format!(r"\{}", cmd);
-        let double = format!(r"\\{}", cmd);
-        result = result.replace(&double, &format!("__ESCAPED_{}__", cmd));
-        result = result.replace(&single, &double);
-        result = result.replace(&format!("__ESCAPED_{}__", cmd), &double);
+    let bytes = json.as_bytes();
+    let mut result = String::with_capacity(json.len() + json.len() / 8);
+    let mut copied = 0;
+    let mut pos = 0;
+
+    while let Some(offset) = json[pos..].find('\\') {
+        let start = pos + offset;
+        let run = bytes[start..].iter().take_while(|&&b| b == b'\\').count();
+        let after = start + run;
+        if run == 1 && LATEX_COMMANDS.iter().any(|cmd| json[after..].starts_with(cmd)) {
+            result.push_str(&json[copied..after]);
+            result.push('\\');
+            copied = after;
+        }
+        pos = after;
     }
 
+    result.push_str(&json[copied..]);
     result
 }
 
 /// Strip markdown code fences from text
-fn strip_markdown_fences(text: &str) -> String {
+fn strip_markdown_fences(text: &str) -> &str {
     let text = text.trim();
     // Remove ```json\n or ```\n at start and ``` at end
     if text.starts_with("```") {
@@ -51,103 +65,206 @@ fn strip_markdown_fences(text: &str) -> String {
         };
         let text = text.trim_start_matches('\n');
         let text = text.strip_suffix("```").unwrap_or(text);
-        text.trim().to_string()
+        text.trim()
     } else {
-        text.to_string()
+        text
     }
 }
 
 /// Extract JSON object from text that might contain extra content
-fn extract_json(text: &str) -> Option<String> {
-    let start = text.find('{')?;
-    let mut depth = 0;
-    let mut end = start;
-
-    for (i, c) in text[start..].char_indices() {
-        match c {
-            '{' => depth += 1,
-            '}' => {
-                depth -= 1;
-                if depth == 0 {
-                    end = start + i + 1;
-                    break;
-                }
+fn extract_json(text: &str) -> Option<&str> {
+    extract_balanced(text, b'{', b'}')
+}
+
+/// Extract JSON array from text that might contain extra content
+fn extract_json_array(text: &str) -> Option<&str> {
+    extract_balanced(text, b'[', b']')
+}
+
+/// Slice out the first balanced `open`...`close` span without copying.
+/// Scans bytes (both delimiters are ASCII) and ignores delimiters inside JSON
+/// strings, where LaTeX such as \frac{1}{2} or \{ would throw off the count.
+fn extract_balanced(text: &str, open: u8, close: u8) -> Option<&str> {
+    let bytes = text.as_bytes();
+    let start = bytes.iter().position(|&b| b == open)?;
+    let mut depth = 0usize;
+    let mut in_string = false;
+    let mut escaped = false;
+
+    for (i, &b) in bytes[start..].iter().enumerate() {
+        if in_string {
+            if escaped {
+                escaped = false;
+            } else if b == b'\\' {
+                escaped = true;
+            } else if b == b'"' {
+                in_string = false;
+            }
+        } else if b == b'"' {
+            in_string = true;
+        } else if b == open {
+            depth += 1;
+        } else if b == close {
+            depth -= 1;
+            if depth == 0 {
+                return Some(&text[start..start + i + 1]);
             }
-            _ => {}
         }
     }
 
-    if depth == 0 && end > start {
-        Some(text[start..end].to_string())
-    } else {
-        None
-    }
+    None
 }
 
-/// Extract JSON array from text that might contain extra content
-fn extract_json_array(text: &str) -> Option<String> {
-    let start = text.find('[')?;
-    let mut depth = 0;
-    let mut end = start;
-
-    for (i, c) in text[start..].char_indices() {
-        match c {
-            '[' => depth += 1,
-            ']' => {
-                depth -= 1;
-                if depth == 0 {
-                    end = start + i + 1;
-                    break;
-                }
-            }
-            _ => {}
-        }
+/// Split an optional data URL prefix (e.g. "data:image/png;base64,") off an
+/// image payload, returning the declared MIME type and the base64 data.
+/// Only the short header is inspected, so raw base64 payloads (which may be
+/// several MB) are never scanned.
+fn split_data_url(image_base64: &str) -> (Option<&str>, &str) {
+    let Some(rest) = image_base64.strip_prefix("data:") else {
+        return (None, image_base64);
+    };
+    match rest.split_once(',') {
+        Some((header, data)) => (header.split(';').next(), data),
+        None => (None, image_base64),
     }
+}
 
-    if depth == 0 && end > start {
-        Some(text[start..end].to_string())
+/// Detect the image format from the base64-encoded file signature.
+/// Camera captures arrive as raw JPEG base64 with no data URL, so they must
+/// not be declared as PNG. Defaults to PNG (the canvas export format).
+fn sniff_image_type(base64_data: &str) -> &'static str {
+    if base64_data.starts_with("/9j/") {
+        "image/jpeg"
+    } else if base64_data.starts_with("UklGR") {
+        "image/webp"
     } else {
-        None
+        "image/png"
+    }
+}
+
+/// Paper-specific instructions injected into question generation prompts
+fn paper_instructions(paper_type: Option<&str>) -> &'static str {
+    match paper_type {
+        Some("paper1") => "Paper 1 style: NO CALCULATOR. Use exact values only (fractions, surds, π, e). Focus on algebraic manipulation, factorization, simplification, and proofs. Include 'show that' steps. Penalize decimal approximations.",
+        Some("paper2") => "Paper 2 style: CALCULATOR ALLOWED. Use real-world context (motion, growth, economics, optimization). Include numerical solving, graph interpretation, statistics. Ask for interpretation of results and model assumptions.",
+        Some("paper3") => "Paper 3 style: HL Investigation. CALCULATOR ALLOWED. Create unfamiliar problem settings with new definitions. Require multi-topic integration and deep reasoning. Use 'explore', 'investigate', 'hence deduce' language. Focus on proof and mathematical discovery.",
+        _ => "Paper 1 style: NO CALCULATOR. Use exact values only.",
     }
 }
 
+/// Template variables shared by single and batch question generation
+fn question_prompt_vars(
+    subject: &str,
+    topic: &str,
+    difficulty: i32,
+    paper_type: Option<&str>,
+) -> HashMap<&'static str, String> {
+    let mut vars = HashMap::new();
+    vars.insert("subject", subject.to_string());
+    vars.insert("topic", topic.to_string());
+    vars.insert("difficulty", difficulty.to_string());
+    vars.insert("paper_type", paper_type.unwrap_or("paper1").to_string());
+    vars.insert("paper_instructions", paper_instructions(paper_type).to_string());
+    vars
+}
+
+// Only the fields that are kept are declared; serde skips the rest ("hints",
+// "reasoning") without allocating them
 #[derive(Debug, Deserialize)]
 struct GeneratedQuestion {
     question: String,
     answer: String,
-    solution_steps: Vec<GeneratedStep>,
-    #[allow(dead_code)]
-    hints: Option<Vec<String>>,
-}
-
-#[derive(Debug, Deserialize)]
-struct GeneratedStep {
-    step: i32,
-    description: String,
-    expression: String,
+    solution_steps: Vec<SolutionStep>,
 }
 
 #[derive(Debug, Deserialize)]
 struct GradingResponse {
     is_correct: bool,
-    #[allow(dead_code)]
-    reasoning: Option<String>,
+}
+
+/// Maximum in-flight Gemini requests per task. Generation is kept apart so
+/// slow batched calls cannot hold every permit while OCR and grading wait.
+#[derive(Debug, Clone, Copy)]
+pub struct ConcurrencyLimits {
+    pub generation: usize,
+    pub ocr: usize,
+    pub grading: usize,
 }
 
 pub struct GeminiClient {
     client: Client,
     prompt_loader: Arc<PromptLoader>,
+    generation_permits: Semaphore,
+    ocr_permits: Semaphore,
+    grading_permits: Semaphore,
+    grade_cache: GradeCache,
+    model: String,
+    ocr_model: String,
+    grading_model: String,
 }
 
 impl GeminiClient {
-    pub fn new(_http_client: reqwest::Client, _api_key: &str, prompt_loader: Arc<PromptLoader>) -> Self {
+    /// Built once at startup and shared through AppState so the underlying
+    /// HTTP connection pool (and its TLS sessions) is reused across requests.
+    pub fn new(prompt_loader: Arc<PromptLoader>, limits: ConcurrencyLimits) -> Self {
         // genai::Client reads GEMINI_API_KEY from environment automatically
         Self {
             client: Client::default(),
             prompt_loader,
+            generation_permits: Semaphore::new(limits.generation.max(1)),
+            ocr_permits: Semaphore::new(limits.ocr.max(1)),
+            grading_permits: Semaphore::new(limits.grading.max(1)),
+            grade_cache: GradeCache::new(DEFAULT_CAPACITY),
+            model: MODEL.to_string(),
+            ocr_model: MODEL.to_string(),
+            grading_model: GRADING_MODEL.to_string(),
         }
     }
 
+    /// Override the default models per task, e.g. a lighter model for the
+    /// latency-sensitive OCR and grading calls
+    pub fn with_models(
+        mut self,
+        model: Option<&str>,
+        ocr_model: Option<&str>,
+        grading_model: Option<&str>,
+    ) -> Self {
+        if let Some(model) = model {
+            self.model = model.to_string();
+        }
+        if let Some(ocr_model) = ocr_model {
+            self.ocr_model = ocr_model.to_string();
+        }
+        if let Some(grading_model) = grading_model {
+            self.grading_model = grading_model.to_string();
+        }
+        self
+    }
+
+    pub fn grade_cache_stats(&self) -> CacheStats {
+        self.grade_cache.stats()
+    }
+
+    /// Run a chat request once a permit for its task is available
+    async fn exec_chat(
+        &self,
+        permits: &Semaphore,
+        model: &str,
+        chat_req: ChatRequest,
+        options: &ChatOptions,
+        context: &str,
+    ) -> AppResult<ChatResponse> {
+        let _permit = permits
+            .acquire()
+            .await
+            .map_err(|e| AppError::Internal(format!("Gemini limiter closed: {}", e)))?;
+
+        self.client
+            .exec_chat(model, chat_req, Some(options))
+            .await
+            .map_err(|e| AppError::ExternalService(format!("{}: {}", context, e)))
+    }
+
     pub async fn generate_question(
         &self,
         subject: &str,
@@ -155,20 +272,7 @@ impl GeminiClient {
         difficulty: i32,
         paper_type: Option<&str>,
     ) -> AppResult<Question> {
-        let mut vars = HashMap::new();
-        vars.insert("subject", subject.to_string());
-        vars.insert("topic", topic.to_string());
-        vars.insert("difficulty", difficulty.to_string());
-        vars.insert("paper_type", paper_type.unwrap_or("paper1").to_string());
-
-        // Add paper-specific instructions
-        let paper_instructions = match paper_type {
-            Some("paper1") => "Paper 1 style: NO CALCULATOR. Use exact values only (fractions, surds, π, e). Focus on algebraic manipulation, factorization, simplification, and proofs. Include 'show that' steps. Penalize decimal approximations.",
-            Some("paper2") => "Paper 2 style: CALCULATOR ALLOWED. Use real-world context (motion, growth, economics, optimization). Include numerical solving, graph interpretation, statistics. Ask for interpretation of results and model assumptions.",
-            Some("paper3") => "Paper 3 style: HL Investigation. CALCULATOR ALLOWED. Create unfamiliar problem settings with new definitions. Require multi-topic integration and deep reasoning. Use 'explore', 'investigate', 'hence deduce' language. Focus on proof and mathematical discovery.",
-            _ => "Paper 1 style: NO CALCULATOR. Use exact values only.",
-        };
-        vars.insert("paper_instructions", paper_instructions.to_string());
+        let vars = question_prompt_vars(subject, topic, difficulty, paper_type);
 
         let prompt = self.prompt_loader.load_and_render(
             "question_generation",
@@ -189,10 +293,15 @@ impl GeminiClient {
             .with_temperature(0.4)
             .with_max_tokens(8192);
 
-        let response = self.client
-            .exec_chat(MODEL, chat_req, Some(&options))
-            .await
-            .map_err(|e| AppError::ExternalService(format!("Gemini API error: {}", e)))?;
+        let response = self
+            .exec_chat(
+                &self.generation_permits,
+                &self.model,
+                chat_req,
+                &options,
+                "Gemini API error",
+            )
+            .await?;
 
         let text = response
             .content_text_as_str()
@@ -200,10 +309,10 @@ impl GeminiClient {
 
         // Strip markdown fences and extract JSON
         let stripped = strip_markdown_fences(text);
-        let json_text = extract_json(&stripped).unwrap_or(stripped);
+        let json_text = extract_json(stripped).unwrap_or(stripped);
 
         // Fix LaTeX escapes
-        let fixed_json = fix_latex_escapes(&json_text);
+        let fixed_json = fix_latex_escapes(json_text);
 
         // Parse the JSON response
         let generated: GeneratedQuestion = serde_json::from_str(&fixed_json).map_err(|e| {
@@ -214,23 +323,13 @@ impl GeminiClient {
             ))
         })?;
 
-        let solution_steps: Vec<SolutionStep> = generated
-            .solution_steps
-            .into_iter()
-            .map(|s| SolutionStep {
-                step_number: s.step,
-                description: s.description,
-                expression_latex: s.expression,
-            })
-            .collect();
-
         Ok(Question::new(
             subject,
             topic,
             difficulty,
             &generated.question,
             &generated.answer,
-            solution_steps,
+            generated.solution_steps,
             "generated",
         ))
     }
@@ -244,22 +343,9 @@ impl GeminiClient {
         paper_type: Option<&str>,
         count: i32,
     ) -> AppResult<Vec<Question>> {
-        let mut vars = HashMap::new();
-        vars.insert("subject", subject.to_string());
-        vars.insert("topic", topic.to_string());
-        vars.insert("difficulty", difficulty.to_string());
-        vars.insert("paper_type", paper_type.unwrap_or("paper1").to_string());
+        let mut vars = question_prompt_vars(subject, topic, difficulty, paper_type);
         vars.insert("count", count.to_string());
 
-        // Add paper-specific instructions
-        let paper_instructions = match paper_type {
-            Some("paper1") => "Paper 1 style: NO CALCULATOR. Use exact values only (fractions, surds, π, e). Focus on algebraic manipulation, factorization, simplification, and proofs. Include 'show that' steps. Penalize decimal approximations.",
-            Some("paper2") => "Paper 2 style: CALCULATOR ALLOWED. Use real-world context (motion, growth, economics, optimization). Include numerical solving, graph interpretation, statistics. Ask for interpretation of results and model assumptions.",
-            Some("paper3") => "Paper 3 style: HL Investigation. CALCULATOR ALLOWED. Create unfamiliar problem settings with new definitions. Require multi-topic integration and deep reasoning. Use 'explore', 'investigate', 'hence deduce' language. Focus on proof and mathematical discovery.",
-            _ => "Paper 1 style: NO CALCULATOR. Use exact values only.",
-        };
-        vars.insert("paper_instructions", paper_instructions.to_string());
-
         let prompt = self.prompt_loader.load_and_render(
             "question_generation",
             Some(subject),
@@ -279,10 +365,15 @@ impl GeminiClient {
             .with_temperature(0.5)  // Slightly higher for variety
             .with_max_tokens(16384);  // More tokens for multiple questions
 
-        let response = self.client
-            .exec_chat(MODEL, chat_req, Some(&options))
-            .await
-            .map_err(|e| AppError::ExternalService(format!("Gemini API error: {}", e)))?;
+        let response = self
+            .exec_chat(
+                &self.generation_permits,
+                &self.model,
+                chat_req,
+                &options,
+                "Gemini API error",
+            )
+            .await?;
 
         let text = response
             .content_text_as_str()
@@ -290,10 +381,10 @@ impl GeminiClient {
 
         // Strip markdown fences and extract JSON array
         let stripped = strip_markdown_fences(text);
-        let json_text = extract_json_array(&stripped).unwrap_or(stripped);
+        let json_text = extract_json_array(stripped).unwrap_or(stripped);
 
         // Fix LaTeX escapes
-        let fixed_json = fix_latex_escapes(&json_text);
+        let fixed_json = fix_latex_escapes(json_text);
 
         // Parse the JSON array response
         let generated: Vec<GeneratedQuestion> = serde_json::from_str(&fixed_json).map_err(|e| {
@@ -308,23 +399,13 @@ impl GeminiClient {
         let questions: Vec<Question> = generated
             .into_iter()
             .map(|g| {
-                let solution_steps: Vec<SolutionStep> = g
-                    .solution_steps
-                    .into_iter()
-                    .map(|s| SolutionStep {
-                        step_number: s.step,
-                        description: s.description,
-                        expression_latex: s.expression,
-                    })
-                    .collect();
-
                 Question::new(
                     subject,
                     topic,
                     difficulty,
                     &g.question,
                     &g.answer,
-                    solution_steps,
+                    g.solution_steps,
                     "generated",
                 )
             })
@@ -334,20 +415,14 @@ impl GeminiClient {
     }
 
     pub async fn ocr_image(&self, image_base64: &str) -> AppResult<String> {
-        // Strip data URL prefix if present (e.g., "data:image/png;base64,")
-        let base64_data = if let Some(pos) = image_base64.find(",") {
-            &image_base64[pos + 1..]
-        } else {
-            image_base64
-        };
-
-        // Detect content type from data URL or default to PNG
-        let content_type = if image_base64.starts_with("data:image/jpeg") {
-            "image/jpeg"
-        } else if image_base64.starts_with("data:image/webp") {
-            "image/webp"
-        } else {
-            "image/png"
+        let (mime_type, base64_data) = split_data_url(image_base64);
+
+        // Detect content type from data URL, falling back to the image signature
+        let content_type = match mime_type {
+            Some("image/jpeg") => "image/jpeg",
+            Some("image/webp") => "image/webp",
+            Some("image/png") => "image/png",
+            _ => sniff_image_type(base64_data),
         };
 
         let chat_req = ChatRequest::new(vec![
@@ -366,10 +441,15 @@ impl GeminiClient {
         let options = ChatOptions::default()
             .with_temperature(0.1);
 
-        let response = self.client
-            .exec_chat(MODEL, chat_req, Some(&options))
-            .await
-            .map_err(|e| AppError::ExternalService(format!("Gemini OCR error: {}", e)))?;
+        let response = self
+            .exec_chat(
+                &self.ocr_permits,
+                &self.ocr_model,
+                chat_req,
+                &options,
+                "Gemini OCR error",
+            )
+            .await?;
 
         let latex = response
             .content_text_as_str()
@@ -386,6 +466,12 @@ impl GeminiClient {
         user_answer: &str,
         correct_answer: &str,
     ) -> AppResult<bool> {
+        // The same answers to the same question come up repeatedly across quizzes
+        let cache_key = GradeCache::key(question_latex, user_answer, correct_answer);
+        if let Some(is_correct) = self.grade_cache.get(cache_key) {
+            return Ok(is_correct);
+        }
+
         let prompt = format!(
             r#"You are grading a math answer. Determine if the student's answer is mathematically equivalent to the correct answer.
 
@@ -418,10 +504,15 @@ No markdown, no code fences, just the JSON object."#,
         let options = ChatOptions::default()
             .with_temperature(0.1);
 
-        let response = self.client
-            .exec_chat(GRADING_MODEL, chat_req, Some(&options))
-            .await
-            .map_err(|e| AppError::ExternalService(format!("Gemini grading error: {}", e)))?;
+        let response = self
+            .exec_chat(
+                &self.grading_permits,
+                &self.grading_model,
+                chat_req,
+                &options,
+                "Gemini grading error",
+            )
+            .await?;
 
         let text = response
             .content_text_as_str()
@@ -429,13 +520,17 @@ No markdown, no code fences, just the JSON object."#,
 
         // Strip markdown fences and extract JSON
         let stripped = strip_markdown_fences(text);
-        let json_text = extract_json(&stripped).unwrap_or(stripped);
+        let json_text = extract_json(stripped).unwrap_or(stripped);
 
         // Parse the response
-        let is_correct = match serde_json::from_str::<GradingResponse>(&json_text) {
-            Ok(grading) => grading.is_correct,
+        let is_correct = match serde_json::from_str::<GradingResponse>(json_text) {
+            Ok(grading) => {
+                self.grade_cache.insert(cache_key, grading.is_correct);
+                grading.is_correct
+            }
             Err(_) => {
-                // Fallback: try to find is_correct pattern in text
+                // Fallback: try to find is_correct pattern in text. Not cached,
+                // so a malformed reply is retried on the next submission.
                 let lower = json_text.to_lowercase();
                 lower.contains("\"is_correct\": true") || lower.contains("\"is_correct\":true")
             }
@@ -444,3 +539,37 @@ No markdown, no code fences, just the JSON object."#,
         Ok(is_correct)
     }
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_extract_balanced_ignores_braces_in_strings() {
+        let text = r#"Here you go: {"answer": "\{x \mid x > 0", "steps": [{"step": 1}]} trailing"#;
+        assert_eq!(
+            extract_json(text),
+            Some(r#"{"answer": "\{x \mid x > 0", "steps": [{"step": 1}]}"#)
+        );
+        assert_eq!(extract_json_array(r#"x [1, "]", [2]] y"#), Some(r#"[1, "]", [2]]"#));
+        assert_eq!(extract_json("{unterminated"), None);
+    }
+
+    #[test]
+    fn test_split_data_url() {
+        assert_eq!(
+            split_data_url("data:image/jpeg;base64,/9j/4AAQ"),
+            (Some("image/jpeg"), "/9j/4AAQ")
+        );
+        assert_eq!(split_data_url("iVBORw0KGgo"), (None, "iVBORw0KGgo"));
+        assert_eq!(sniff_image_type("/9j/4AAQ"), "image/jpeg");
+    }
+
+    #[test]
+    fn test_fix_latex_escapes() {
+        assert_eq!(
+            fix_latex_escapes(r#"{"q": "\frac{1}{2} \\sqrt{2} \in \x"}"#),
+            r#"{"q": "\\frac{1}{2} \\sqrt{2} \\in \x"}"#
+        );
+    }
+}
@@ -0,0 +1,130 @@
+use serde::Serialize;
+use std::collections::hash_map::DefaultHasher;
+use std::collections::{HashMap, VecDeque};
+use std::hash::{Hash, Hasher};
+use std::sync::Mutex;
+
+/// Default number of grading results kept in memory
+pub const DEFAULT_CAPACITY: usize = 4096;
+
+#[derive(Debug, Clone, Copy, Serialize)]
+pub struct CacheStats {
+    pub hits: u64,
+    pub misses: u64,
+    pub entries: usize,
+    pub hit_rate: f64,
+}
+
+/// Bounded cache of grading verdicts keyed by a hash of
+/// (question, student answer, correct answer).
+/// The oldest entries are evicted first once capacity is reached.
+pub struct GradeCache {
+    inner: Mutex<Inner>,
+}
+
+struct Inner {
+    entries: HashMap<u64, bool>,
+    order: VecDeque<u64>,
+    capacity: usize,
+    hits: u64,
+    misses: u64,
+}
+
+impl GradeCache {
+    pub fn new(capacity: usize) -> Self {
+        Self {
+            inner: Mutex::new(Inner {
+                entries: HashMap::with_capacity(capacity),
+                order: VecDeque::with_capacity(capacity),
+                capacity: capacity.max(1),
+                hits: 0,
+                misses: 0,
+            }),
+        }
+    }
+
+    /// Content hash of the grading inputs (surrounding whitespace is ignored)
+    pub fn key(question_latex: &str, user_answer: &str, correct_answer: &str) -> u64 {
+        let mut hasher = DefaultHasher::new();
+        question_latex.trim().hash(&mut hasher);
+        user_answer.trim().hash(&mut hasher);
+        correct_answer.trim().hash(&mut hasher);
+        hasher.finish()
+    }
+
+    pub fn get(&self, key: u64) -> Option<bool> {
+        let mut inner = self.inner.lock().ok()?;
+        let cached = inner.entries.get(&key).copied();
+        if cached.is_some() {
+            inner.hits += 1;
+        } else {
+            inner.misses += 1;
+        }
+        cached
+    }
+
+    pub fn insert(&self, key: u64, is_correct: bool) {
+        let Ok(mut inner) = self.inner.lock() else {
+            return;
+        };
+        if inner.entries.insert(key, is_correct).is_some() {
+            return;
+        }
+        inner.order.push_back(key);
+        while inner.order.len() > inner.capacity {
+            if let Some(oldest) = inner.order.pop_front() {
+                inner.entries.remove(&oldest);
+            }
+        }
+    }
+
+    pub fn stats(&self) -> CacheStats {
+        let Ok(inner) = self.inner.lock() else {
+            return CacheStats {
+                hits: 0,
+                misses: 0,
+                entries: 0,
+                hit_rate: 0.0,
+            };
+        };
+        let lookups = inner.hits + inner.misses;
+        CacheStats {
+            hits: inner.hits,
+            misses: inner.misses,
+            entries: inner.entries.len(),
+            hit_rate: if lookups > 0 {
+                inner.hits as f64 / lookups as f64
+            } else {
+                0.0
+            },
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_hit_and_eviction() {
+        let cache = GradeCache::new(2);
+        let a = GradeCache::key("q", "1", "1");
+        let b = GradeCache::key("q", "2", "1");
+        let c = GradeCache::key("q", "3", "1");
+
+        assert_eq!(cache.get(a), None);
+        cache.insert(a, true);
+        cache.insert(b, false);
+        assert_eq!(cache.get(a), Some(true));
+
+        // Inserting a third entry evicts the oldest one
+        cache.insert(c, false);
+        assert_eq!(cache.get(a), None);
+        assert_eq!(cache.get(b), Some(false));
+
+        let stats = cache.stats();
+        assert_eq!(stats.entries, 2);
+        assert_eq!(stats.hits, 2);
+        assert_eq!(stats.misses, 2);
+    }
+}
@@ -1,4 +1,6 @@
+pub mod answer_check;
 mod gemini;
+pub mod grade_cache;
 pub mod prompt_loader;
 
 pub use gemini::*;
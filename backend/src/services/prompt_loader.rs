@@ -1,6 +1,7 @@
 use std::collections::HashMap;
 use std::fs;
 use std::path::PathBuf;
+use std::sync::{Arc, RwLock};
 use tracing::debug;
 
 const DEFAULT_PROMPT: &str = r#"Generate an IB Higher Level {{subject}} exam-style question on the topic of {{topic}}.
@@ -24,19 +25,114 @@ Return ONLY valid JSON in this exact format (no markdown, no code blocks):
   "hints": ["hint1", "hint2"]
 }"#;
 
+/// A prompt template pre-split into literal text and {{variable}} slots, so
+/// rendering is a single pass with no rescanning of the template text.
+#[derive(Debug)]
+pub struct CompiledTemplate {
+    source: String,
+    segments: Vec<Segment>,
+}
+
+#[derive(Debug)]
+enum Segment {
+    // Byte range into `source`
+    Literal(usize, usize),
+    Var(String),
+}
+
+impl CompiledTemplate {
+    pub fn compile(source: String) -> Self {
+        let mut segments = Vec::new();
+        let mut literal_start = 0;
+        let mut pos = 0;
+
+        while let Some(offset) = source[pos..].find("{{") {
+            let open = pos + offset;
+            let name_start = open + 2;
+            let name_len = source[name_start..]
+                .bytes()
+                .take_while(|b| b.is_ascii_alphanumeric() || *b == b'_')
+                .count();
+            let name_end = name_start + name_len;
+
+            if name_len > 0 && source[name_end..].starts_with("}}") {
+                if open > literal_start {
+                    segments.push(Segment::Literal(literal_start, open));
+                }
+                segments.push(Segment::Var(source[name_start..name_end].to_string()));
+                pos = name_end + 2;
+                literal_start = pos;
+            } else {
+                // Not a placeholder (e.g. LaTeX braces), keep as literal text
+                pos = open + 1;
+            }
+        }
+        if literal_start < source.len() {
+            segments.push(Segment::Literal(literal_start, source.len()));
+        }
+
+        Self { source, segments }
+    }
+
+    /// Substitute variables; placeholders without a value are left as-is
+    pub fn render(&self, vars: &HashMap<&str, String>) -> String {
+        let mut result = String::with_capacity(self.source.len());
+        for segment in &self.segments {
+            match segment {
+                Segment::Literal(start, end) => result.push_str(&self.source[*start..*end]),
+                Segment::Var(name) => match vars.get(name.as_str()) {
+                    Some(value) => result.push_str(value),
+                    None => {
+                        result.push_str("{{");
+                        result.push_str(name);
+                        result.push_str("}}");
+                    }
+                },
+            }
+        }
+        result
+    }
+}
+
 pub struct PromptLoader {
     prompts_dir: PathBuf,
+    // Compiled templates keyed by "subject/name" (or just "name")
+    cache: RwLock<HashMap<String, Arc<CompiledTemplate>>>,
 }
 
 impl PromptLoader {
     pub fn new(prompts_dir: PathBuf) -> Self {
         debug!("Initializing PromptLoader with dir: {:?}", prompts_dir);
-        Self { prompts_dir }
+        Self {
+            prompts_dir,
+            cache: RwLock::new(HashMap::new()),
+        }
     }
 
     /// Load a prompt template, checking for subject-specific override first.
     /// Falls back to default prompt if file doesn't exist.
-    pub fn load(&self, name: &str, subject: Option<&str>) -> String {
+    /// Templates are read from disk and compiled once, then shared from memory
+    /// across requests, so edits to prompt files require a restart.
+    pub fn load_compiled(&self, name: &str, subject: Option<&str>) -> Arc<CompiledTemplate> {
+        let key = match subject {
+            Some(subj) => format!("{}/{}", subj, name),
+            None => name.to_string(),
+        };
+
+        if let Ok(cache) = self.cache.read() {
+            if let Some(template) = cache.get(&key) {
+                return template.clone();
+            }
+        }
+
+        let template = Arc::new(CompiledTemplate::compile(self.read_template(name, subject)));
+        if let Ok(mut cache) = self.cache.write() {
+            cache.insert(key, template.clone());
+        }
+        template
+    }
+
+    fn read_template(&self, name: &str, subject: Option<&str>) -> String {
         // Try subject-specific first: prompts/math/question_generation.txt
         if let Some(subj) = subject {
             let path = self.prompts_dir.join(subj).join(format!("{}.txt", name));
@@ -60,25 +156,15 @@ impl PromptLoader {
         DEFAULT_PROMPT.to_string()
     }
 
-    /// Render a prompt template with variable substitution.
+    /// Load and render a prompt in one step.
     /// Variables use {{variable}} syntax.
-    pub fn render(&self, template: &str, vars: &HashMap<&str, String>) -> String {
-        let mut result = template.to_string();
-        for (key, value) in vars {
-            result = result.replace(&format!("{{{{{}}}}}", key), value);
-        }
-        result
-    }
-
-    /// Load and render a prompt in one step
     pub fn load_and_render(
         &self,
         name: &str,
         subject: Option<&str>,
         vars: &HashMap<&str, String>,
     ) -> String {
-        let template = self.load(name, subject);
-        self.render(&template, vars)
+        self.load_compiled(name, subject).render(vars)
     }
 }
 
@@ -88,20 +174,58 @@ mod tests {
 
     #[test]
     fn test_render_substitution() {
-        let loader = PromptLoader::new(PathBuf::from("./prompts"));
-        let template = "Hello {{name}}, your score is {{score}}";
+        let template = CompiledTemplate::compile(
+            "Hello {{name}}, your score is {{score}}".to_string(),
+        );
         let mut vars = HashMap::new();
         vars.insert("name", "Alice".to_string());
         vars.insert("score", "95".to_string());
 
-        let result = loader.render(template, &vars);
+        let result = template.render(&vars);
         assert_eq!(result, "Hello Alice, your score is 95");
     }
 
+    #[test]
+    fn test_render_leaves_unknown_placeholders() {
+        let template = CompiledTemplate::compile("{{a}} and {{b}}, x^{{2}} {{".to_string());
+        let mut vars = HashMap::new();
+        vars.insert("a", "{{b}}".to_string());
+
+        // Values are not rescanned, so "{{b}}" in a value stays literal
+        assert_eq!(template.render(&vars), "{{b}} and {{b}}, x^{{2}} {{");
+    }
+
     #[test]
     fn test_fallback_to_default() {
         let loader = PromptLoader::new(PathBuf::from("/nonexistent"));
-        let prompt = loader.load("question_generation", Some("math"));
+        let prompt = loader
+            .load_compiled("question_generation", Some("math"))
+            .render(&HashMap::new());
         assert!(prompt.contains("Generate an IB Higher Level"));
     }
+
+    #[test]
+    fn test_load_is_cached() {
+        let dir = std::env::temp_dir().join(format!("prompt_loader_{}", std::process::id()));
+        fs::create_dir_all(&dir).unwrap();
+        let path = dir.join("cached_prompt.txt");
+        fs::write(&path, "Cached {{topic}}").unwrap();
+
+        let loader = PromptLoader::new(dir.clone());
+        let mut vars = HashMap::new();
+        vars.insert("topic", "calculus".to_string());
+        assert_eq!(
+            loader.load_and_render("cached_prompt", None, &vars),
+            "Cached calculus"
+        );
+
+        // Served from memory even after the file is gone
+        fs::remove_file(&path).unwrap();
+        assert_eq!(
+            loader.load_and_render("cached_prompt", None, &vars),
+            "Cached calculus"
+        );
+
+        fs::remove_dir_all(&dir).ok();
+    }
 }